@@ -1,17 +1,60 @@
+import atexit
 import datetime
+from array import array
 import json
+import mmap
 import os
+import queue
+import threading
+
+# orjson is much faster than the built in json module, but it's optional.
+# If it isn't installed we fall back to json.
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Set the files we need.
 INVENTORY_FILE = 'inventory.json'
-DONATIONS_FILE = 'donations.json'
-DISTRIBUTIONS_FILE = 'distributions.json'
+# The donation and distribution logs only ever grow, so they are stored as
+# JSON Lines (one record per line) and new records are appended to the end.
+DONATIONS_FILE = 'donations.jsonl'
+DISTRIBUTIONS_FILE = 'distributions.jsonl'
+
+# Saves are batched: changes are written out at most once every SAVE_DELAY seconds.
+SAVE_DELAY = 0.5
+_pending_saves = {}
+_save_timer = None
+_save_lock = threading.Lock()
+_append_lock = threading.Lock()
+
+# Log files are opened once and kept open for appending. Records are only
+# forced to disk (fsync) every FSYNC_EVERY appends, and again at exit.
+FSYNC_EVERY = 32
+_log_fds = {}
+_unsynced_counts = {}
+
+# Appends are handed to a background thread so the caller (e.g. a GUI button)
+# never waits on the disk. The thread drains up to WRITE_BATCH_SIZE queued
+# records at a time and writes each file's share with a single os.write.
+USE_WRITER_THREAD = True
+WRITE_BATCH_SIZE = 64
+_write_queue = queue.Queue()
+_writer_thread = None
 
 def load_data(file_path):
     '''Load the file needed to get or store data'''
-    if not os.path.exists(file_path):
-        return []
     try:
+        if ORJSON_AVAILABLE:
+            # Parse straight out of a memory map so the file isn't copied
+            # into a bytes object first.
+            with open(file_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return []
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    with memoryview(mm) as view:
+                        return orjson.loads(view)
         with open(file_path, 'r') as f:
             return json.load(f)
     except (json.JSONDecodeError, FileNotFoundError):
@@ -19,27 +62,222 @@ def load_data(file_path):
 
 def save_data(file_path, data):
     '''Save the data to the given file'''
+    if isinstance(data, Inventory):
+        data = data.to_records()
+    if ORJSON_AVAILABLE:
+        with open(file_path, 'wb') as f:
+            f.write(orjson.dumps(data))
+        return
     with open(file_path, 'w') as f:
-        json.dump(data, f, indent=4)
+        json.dump(data, f, separators=(',', ':'))
+
+def load_jsonl(file_path):
+    '''Load a JSON Lines log file, one record per line'''
+    records = []
+    try:
+        with open(file_path, 'rb') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(orjson.loads(line) if ORJSON_AVAILABLE else json.loads(line))
+                except ValueError:
+                    # Skip a half written line instead of losing the whole log.
+                    # (ValueError covers both bad JSON and a line cut off in
+                    # the middle of a multi-byte character.)
+                    continue
+    except FileNotFoundError:
+        return _migrate_legacy_log(file_path)
+    return records
+
+def _migrate_legacy_log(file_path):
+    '''Older versions kept each log as one .json list. Convert it to JSON Lines'''
+    legacy_path = os.path.splitext(file_path)[0] + '.json'
+    records = load_data(legacy_path)
+    if not records:
+        return []
+    # Written to a temporary file and swapped in, so a crash part way through
+    # can't leave a partial log behind that stops the conversion running again.
+    temp_path = file_path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        for record in records:
+            f.write(orjson.dumps(record) + b'\n' if ORJSON_AVAILABLE else (json.dumps(record) + '\n').encode())
+    os.replace(temp_path, file_path)
+    return records
+
+def append_record(file_path, record):
+    '''Add a single record to the end of a JSON Lines log file'''
+    global _writer_thread
+    if ORJSON_AVAILABLE:
+        line = orjson.dumps(record) + b'\n'
+    else:
+        line = (json.dumps(record, separators=(',', ':')) + '\n').encode()
+    if not USE_WRITER_THREAD:
+        _write_lines(file_path, [line])
+        return
+    with _append_lock:
+        if _writer_thread is None:
+            _writer_thread = threading.Thread(target=_writer_loop, daemon=True)
+            _writer_thread.start()
+    _write_queue.put((file_path, line))
+
+def _writer_loop():
+    '''Background thread that writes queued log records in batches'''
+    while True:
+        batch = [_write_queue.get()]
+        while len(batch) < WRITE_BATCH_SIZE:
+            try:
+                batch.append(_write_queue.get_nowait())
+            except queue.Empty:
+                break
+        lines_by_file = {}
+        for file_path, line in batch:
+            lines_by_file.setdefault(file_path, []).append(line)
+        for file_path, lines in lines_by_file.items():
+            try:
+                _write_lines(file_path, lines)
+            except OSError as e:
+                print(f"Error: Could not write to {file_path}: {e}")
+        for _ in batch:
+            _write_queue.task_done()
+
+def _write_lines(file_path, lines):
+    '''Write encoded lines to a log file with one os.write call'''
+    with _append_lock:
+        fd = _log_fds.get(file_path)
+        if fd is None:
+            fd = os.open(file_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            _log_fds[file_path] = fd
+            _unsynced_counts[file_path] = 0
+        os.write(fd, b''.join(lines))
+        _unsynced_counts[file_path] += len(lines)
+        if _unsynced_counts[file_path] >= FSYNC_EVERY:
+            os.fsync(fd)
+            _unsynced_counts[file_path] = 0
+
+def close_logs():
+    '''Sync and close every log file opened by append_record'''
+    if _writer_thread is not None:
+        # Wait for the writer thread to finish anything still queued.
+        _write_queue.join()
+    with _append_lock:
+        for fd in _log_fds.values():
+            os.fsync(fd)
+            os.close(fd)
+        _log_fds.clear()
+        _unsynced_counts.clear()
+
+def schedule_save(file_path, data):
+    '''Mark a file as changed so it gets saved with the next batch'''
+    global _save_timer
+    with _save_lock:
+        _pending_saves[file_path] = data
+        if _save_timer is None:
+            _save_timer = threading.Timer(SAVE_DELAY, flush_all)
+            _save_timer.daemon = True
+            _save_timer.start()
+
+def flush_all():
+    '''Write every file with pending changes to disk'''
+    global _save_timer
+    with _save_lock:
+        if _save_timer is not None:
+            _save_timer.cancel()
+            _save_timer = None
+        for file_path, data in _pending_saves.items():
+            save_data(file_path, data)
+        _pending_saves.clear()
+
+# Make sure nothing is lost if the program exits before the timer fires.
+atexit.register(flush_all)
+atexit.register(close_logs)
+
+class Inventory:
+    '''
+    The pantry inventory, stored as parallel columns (names, quantities,
+    expiration dates) instead of a list of dicts. Quantities live in a
+    compact int array, which makes totals and other whole-inventory
+    queries cheap. On disk it is still the usual list of dicts.
+    '''
+    def __init__(self, records=()):
+        self.names = []
+        self.qtys = array('i')
+        self.exps = []
+        # (lowercase name, expiration date) -> row, and lowercase name -> rows
+        self.key_index = {}
+        self.lc_index = {}
+        self.load_records(records)
+
+    def load_records(self, records):
+        '''Add rows from a list of dicts, like the ones in inventory.json'''
+        for record in records:
+            self.add(record['name'], record['quantity'], record['expiration_date'])
+
+    def to_records(self):
+        '''Turn the columns back into a list of dicts for saving'''
+        return [{'name': name, 'quantity': qty, 'expiration_date': exp}
+                for name, qty, exp in zip(self.names, self.qtys, self.exps)]
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        return zip(self.names, self.qtys, self.exps)
+
+    def add(self, item_name, quantity, expiration_date):
+        '''Add stock, merging with an existing row with the same name and date'''
+        name_lc = item_name.lower()
+        row = self.key_index.get((name_lc, expiration_date))
+        if row is not None:
+            self.qtys[row] += quantity
+            return row
+        row = len(self.names)
+        self.names.append(item_name)
+        self.qtys.append(quantity)
+        self.exps.append(expiration_date)
+        self.key_index[(name_lc, expiration_date)] = row
+        self.lc_index.setdefault(name_lc, []).append(row)
+        return row
+
+    def find(self, item_name):
+        '''Return the first row for an item name, or None if there isn't one'''
+        rows = self.lc_index.get(item_name.lower())
+        return rows[0] if rows else None
+
+    def take(self, row, quantity):
+        '''Remove stock from a row'''
+        self.qtys[row] -= quantity
+
+    def total(self):
+        '''Total number of units in the pantry'''
+        return sum(self.qtys)
+
+    def expiring_before(self, date_str):
+        '''Names of items in stock that expire before the given YYYY-MM-DD date'''
+        return [name for name, qty, exp in zip(self.names, self.qtys, self.exps)
+                if qty > 0 and exp < date_str]
+
+def normalize_date(date_str):
+    '''Turn a YYYY-MM-DD date into its canonical form (2025-1-1 -> 2025-01-01)'''
+    try:
+        return datetime.datetime.strptime(date_str.strip(), '%Y-%m-%d').date().isoformat()
+    except ValueError:
+        return None
 
 def add_food_donation(inventory, donations_log, donor_name, item_name, quantity, expiration_date):
     '''Add food donation information'''
     print(f"Processing food donation from {donor_name}...")
 
-    item_found = False
-    for item in inventory:
-        if item['name'].lower() == item_name.lower() and item['expiration_date'] == expiration_date:
-            item['quantity'] += quantity
-            item_found = True
-            break
+    # The inventory merges items on (name, expiration date), so the date has
+    # to be in one canonical form or the same item ends up listed twice.
+    canonical_date = normalize_date(expiration_date)
+    if canonical_date is None:
+        print(f"Error: '{expiration_date}' is not a valid date. Please use YYYY-MM-DD.")
+        return
+    expiration_date = canonical_date
 
-    if not item_found:
-        new_item = {
-            'name': item_name,
-            'quantity': quantity,
-            'expiration_date': expiration_date
-        }
-        inventory.append(new_item)
+    inventory.add(item_name, quantity, expiration_date)
 
     donation_record = {
         'donor': donor_name,
@@ -49,8 +287,8 @@ def add_food_donation(inventory, donations_log, donor_name, item_name, quantity,
     }
     donations_log.append(donation_record)
 
-    save_data(INVENTORY_FILE, inventory)
-    save_data(DONATIONS_FILE, donations_log)
+    schedule_save(INVENTORY_FILE, inventory)
+    append_record(DONATIONS_FILE, donation_record)
     print("Success. Inventory updated and donation logged.")
 
 def add_money_donation(donations_log, donor_name, amount):
@@ -63,78 +301,137 @@ def add_money_donation(donations_log, donor_name, amount):
         'date': "working in progress"
     }
     donations_log.append(donation_record)
-    save_data(DONATIONS_FILE, donations_log)
+    append_record(DONATIONS_FILE, donation_record)
     print("Success. Money donation logged.")
 
 def record_distribution(inventory, distributions_log, household_name, item_name, quantity_taken):
     '''Add distribution record to the file.'''
     print(f"Processing distribution to {household_name}...")
 
-    item_found_in_inventory = False
-    for item in inventory:
-        if item['name'].lower() == item_name.lower():
-            if item['quantity'] >= quantity_taken:
-                item['quantity'] -= quantity_taken
-                item_found_in_inventory = True
-
-                distribution_record = {
-                    'household': household_name,
-                    'item_details': f"{quantity_taken}x {item_name}",
-                    'date': "working in progress"
-                }
-                distributions_log.append(distribution_record)
-
-                save_data(INVENTORY_FILE, inventory)
-                save_data(DISTRIBUTIONS_FILE, distributions_log)
-                print(f"Success. {quantity_taken}x {item_name} distributed to {household_name}.")
-            else:
-                print(f"Error: Not enough {item['name']} in stock. Only {item['quantity']} available.")
-                return
-            break
-
-    if not item_found_in_inventory:
+    row = inventory.find(item_name)
+    if row is None:
         print(f"Error: Item '{item_name}' not found in inventory.")
+        return
+
+    if inventory.qtys[row] < quantity_taken:
+        print(f"Error: Not enough {inventory.names[row]} in stock. Only {inventory.qtys[row]} available.")
+        return
+
+    inventory.take(row, quantity_taken)
+    distribution_record = {
+        'household': household_name,
+        'item_details': f"{quantity_taken}x {item_name}",
+        'date': "working in progress"
+    }
+    distributions_log.append(distribution_record)
+
+    schedule_save(INVENTORY_FILE, inventory)
+    append_record(DISTRIBUTIONS_FILE, distribution_record)
+    print(f"Success. {quantity_taken}x {item_name} distributed to {household_name}.")
 
 def view_inventory(inventory):
-    '''Pulls the inventory info from the file'''
+    '''Pulls the inventory info from the file, one line at a time'''
     print("[Backend] Getting inventory.")
-    output = []
     if not inventory:
-        output.append("Inventory is empty.")
-    else:
-        for item in inventory:
-            if item['quantity'] > 0:
-                output.append(f"- {item['name']}, Quantity: {item['quantity']}, Expires: {item['expiration_date']}")
-    return output
+        yield "Inventory is empty."
+        return
+    for name, qty, exp in inventory:
+        if qty > 0:
+            yield f"- {name}, Quantity: {qty}, Expires: {exp}"
 
 def view_donations(donations_log):
-    '''View all donations logged'''
+    '''View all donations logged, one line at a time'''
     print("[Backend] Getting donations.")
-    output = []
     if not donations_log:
-        output.append("No donations logged.")
-    else:
-        for log in donations_log:
-            output.append(f"- Date: {log['date']}, Donor: {log['donor']}, Type: {log['type']}, Details: {log['item_details']}")
-    return output
+        yield "No donations logged."
+        return
+    for log in donations_log:
+        yield f"- Date: {log['date']}, Donor: {log['donor']}, Type: {log['type']}, Details: {log['item_details']}"
 
 def view_distributions(distributions_log):
-    '''View all food distribution logged'''
+    '''View all food distribution logged, one line at a time'''
     print("[Backend] Getting distributions")
-    output = []
     if not distributions_log:
-        output.append("No distributions logged.")
-    else:
-        for log in distributions_log:
-            output.append(f"- Date: {log['date']}, Household: {log['household']}, Items: {log['item_details']}")
-    return output
+        yield "No distributions logged."
+        return
+    for log in distributions_log:
+        yield f"- Date: {log['date']}, Household: {log['household']}, Items: {log['item_details']}"
+
+# Returned by a menu handler to end the main loop.
+STOP = object()
+
+def _read_number(prompt, convert, error_message):
+    '''Ask for a number, printing an error and returning None if it is invalid'''
+    try:
+        return convert(input(prompt))
+    except ValueError:
+        print(error_message)
+        return None
 
 def main():
 
     # Load the data
-    inventory = load_data(INVENTORY_FILE)
-    donations_log = load_data(DONATIONS_FILE)
-    distributions_log = load_data(DISTRIBUTIONS_FILE)
+    inventory = Inventory(load_data(INVENTORY_FILE))
+    donations_log = load_jsonl(DONATIONS_FILE)
+    distributions_log = load_jsonl(DISTRIBUTIONS_FILE)
+
+    # Menu handlers. Each one handles a single menu option.
+    def do_view_inventory():
+        print("\nInventory:")
+        for i in view_inventory(inventory):
+            print(i)
+
+    def do_log_food():
+        print("\nLog a Food Donation")
+        donor = input("Enter donor's name: ")
+        item = input("Enter item name: ")
+        qty = _read_number("Enter quantity: ", int, "Invalid quantity. Please enter a whole number.")
+        if qty is None:
+            return
+        exp_date = input("Enter expiration date (YYYY-MM-DD): ")
+        add_food_donation(inventory, donations_log, donor, item, qty, exp_date)
+
+    def do_log_money():
+        print("\nLog a Money Donation")
+        donor = input("Enter donor's name: ")
+        amount = _read_number("Enter amount: $", float, "Invalid amount. Please enter a number.")
+        if amount is None:
+            return
+        add_money_donation(donations_log, donor, amount)
+
+    def do_record_distribution():
+        print("\nRecord Food Distribution")
+        household = input("Enter household name/ID: ")
+        item = input("Enter item to distribute: ")
+        qty = _read_number("Enter quantity to give: ", int, "Invalid quantity. Please enter a whole number.")
+        if qty is None:
+            return
+        record_distribution(inventory, distributions_log, household, item, qty)
+
+    def do_view_donations():
+        print("\nDonations:")
+        for i in view_donations(donations_log):
+            print(i)
+
+    def do_view_distributions():
+        print("\nDistributions")
+        for i in view_distributions(distributions_log):
+            print(i)
+
+    def do_exit():
+        print("Exiting.")
+        flush_all()
+        return STOP
+
+    dispatch = {
+        '1': do_view_inventory,
+        '2': do_log_food,
+        '3': do_log_money,
+        '4': do_record_distribution,
+        '5': do_view_donations,
+        '6': do_view_distributions,
+        '0': do_exit,
+    }
 
     print("\nWelcome to the Pantry Command Line!")
     print("----------------------------")
@@ -153,56 +450,12 @@ def main():
 
         choice = input("Enter an option: ")
 
-        if choice == '1':
-            output = view_inventory(inventory)
-            print("\nInventory:")
-            for i in output:
-                print(i)
-        elif choice == '2':
-            print("\nLog a Food Donation")
-            donor = input("Enter donor's name: ")
-            item = input("Enter item name: ")
-            try:
-                qty = int(input("Enter quantity: "))
-            except ValueError:
-                print("Invalid quantity. Please enter a whole number.")
-                continue
-            exp_date = input("Enter expiration date (YYYY-MM-DD): ")
-            add_food_donation(inventory, donations_log, donor, item, qty, exp_date)
-        elif choice == '3':
-            print("\nLog a Money Donation")
-            donor = input("Enter donor's name: ")
-            try:
-                amount = float(input("Enter amount: $"))
-            except ValueError:
-                print("Invalid amount. Please enter a number.")
-                continue
-            add_money_donation(donations_log, donor, amount)
-        elif choice == '4':
-            print("\nRecord Food Distribution")
-            household = input("Enter household name/ID: ")
-            item = input("Enter item to distribute: ")
-            try:
-                qty = int(input("Enter quantity to give: "))
-            except ValueError:
-                print("Invalid quantity. Please enter a whole number.")
-                continue
-            record_distribution(inventory, distributions_log, household, item, qty)
-        elif choice == '5':
-            output = view_donations(donations_log)
-            print("\nDonations:")
-            for i in output:
-                print(i)
-        elif choice == '6':
-            output = view_distributions(distributions_log)
-            print("\nDistributions")
-            for i in output:
-                print(i)
-        elif choice == '0':
-            print("Exiting.")
-            break
-        else:
+        handler = dispatch.get(choice)
+        if handler is None:
             print("Invalid choice. Please enter a number between 0 and 6.")
+            continue
+        if handler() is STOP:
+            break
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
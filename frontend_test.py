@@ -1,3 +1,4 @@
+import threading
 import tkinter as tk
 import backend
 
@@ -13,12 +14,49 @@ food_donations = []
 money_donations = []
 food_distribution = []
 
-inventory=backend.load_data(backend.INVENTORY_FILE)
-donations_log = backend.load_data(backend.DONATIONS_FILE)
-distributions_log = backend.load_data(backend.DISTRIBUTIONS_FILE)
+# The data is loaded in the background once the window is up (see _bg_load),
+# so these start out empty. They are filled in place so the button functions
+# below keep pointing at the same objects.
+inventory, donations_log, distributions_log = backend.Inventory(), [], []
+data_loaded = threading.Event()
+# Set to the exception if loading failed. The buttons stay disabled then, so
+# half loaded data is never saved over the files.
+load_error = None
+
+def _bg_load():
+    global load_error
+    try:
+        inventory.load_records(backend.load_data(backend.INVENTORY_FILE))
+        donations_log.extend(backend.load_jsonl(backend.DONATIONS_FILE))
+        distributions_log.extend(backend.load_jsonl(backend.DISTRIBUTIONS_FILE))
+    except Exception as e:
+        load_error = e
+    finally:
+        data_loaded.set()
+
+def _refresh_ui():
+    # Tk isn't thread safe, so the main loop checks on the loader instead
+    # of the loader touching the widgets itself.
+    if not data_loaded.is_set():
+        root.after(50, _refresh_ui)
+    elif load_error is not None:
+        loading_label.config(text=f"Could not load data: {load_error}")
+    else:
+        loading_label.config(text="")
+
+def _data_ready():
+    if not data_loaded.is_set():
+        print("Still loading data, please try again.")
+        return False
+    if load_error is not None:
+        print(f"Could not load data: {load_error}")
+        return False
+    return True
 
 # Button Functions
 def add_food():
+    if not _data_ready():
+        return
     item = food_entry.get()
     try:
         quantity = int(food_quantity_entry.get())
@@ -32,6 +70,8 @@ def add_food():
                 expiration_date=("2000-01-01"))
     
 def add_money():
+    if not _data_ready():
+        return
     try:
         amount = float(money_entry.get())
     except:
@@ -42,6 +82,8 @@ def add_money():
                                    donor_name=donor, amount=amount)
 
 def record_distribution():
+    if not _data_ready():
+        return
     household = household_entry.get()
     item = distribute_item_entry.get()
     try:
@@ -59,23 +101,30 @@ def view_distributions_inventory():
     log_window.title("Donation Logs")
     log_window.geometry("600x400")
 
-    # Show the inventory
-    tk.Label(log_window, text="Inventory", font=("Arial", 10, "bold")).pack(pady=5)
-    output = backend.view_inventory(inventory=inventory)
-    for i in output:
-        tk.Label(log_window, text=i).pack(anchor="w")
-    
-    # Show donation list
-    tk.Label(log_window, text="Donations", font=("Arial", 10, "bold")).pack(pady=5)
-    output = backend.view_donations(donations_log=donations_log)
-    for i in output:
-        tk.Label(log_window, text=i).pack(anchor="w")
-    
-    # Show distribution list
-    tk.Label(log_window, text="Distributions", font=("Arial", 10, "bold")).pack(pady=5)
-    output = backend.view_distributions(distributions_log=distributions_log)
-    for i in output:
-        tk.Label(log_window, text=output).pack(anchor="w")
+    # Everything goes into one Text widget instead of one Label per line,
+    # which stays quick even when the logs get long.
+    scrollbar = tk.Scrollbar(log_window)
+    scrollbar.pack(side="right", fill="y")
+    txt = tk.Text(log_window, wrap="none", yscrollcommand=scrollbar.set)
+    txt.pack(fill="both", expand=True)
+    scrollbar.config(command=txt.yview)
+    txt.tag_configure("heading", font=("Arial", 10, "bold"))
+
+    inventory_text = "\n".join(backend.view_inventory(inventory=inventory))
+    donations_text = "\n".join(backend.view_donations(donations_log=donations_log))
+    distributions_text = "\n".join(backend.view_distributions(distributions_log=distributions_log))
+
+    # A single insert call with (text, tag) pairs for the three sections.
+    txt.insert("end",
+               "Inventory\n", "heading", inventory_text + "\n\n", (),
+               "Donations\n", "heading", donations_text + "\n\n", (),
+               "Distributions\n", "heading", distributions_text + "\n", ())
+    txt.configure(state="disabled")
+
+def on_close():
+    # Write out any saves still waiting in the backend before closing.
+    backend.flush_all()
+    root.destroy()
 
 
 # GUI
@@ -83,6 +132,7 @@ def view_distributions_inventory():
 root = tk.Tk()
 root.title("Food Pantry App")
 root.geometry("250x600")
+root.protocol("WM_DELETE_WINDOW", on_close)
 
 
 # FOOD DONATION LABELS, ENTRY BOXES, AND BUTTONS
@@ -165,4 +215,9 @@ tk.Button(root, text="Record Distribution", command=record_distribution).grid(ro
 tk.Button(root, text="View Inventory & Distributions", command=view_distributions_inventory).grid(row=14, column=0,
                                                               columnspan=2, pady=10)
 
+loading_label = tk.Label(root, text="Loading...")
+loading_label.grid(row=15, column=0, columnspan=2)
+
+threading.Thread(target=_bg_load, daemon=True).start()
+root.after(0, _refresh_ui)
 root.mainloop()
\ No newline at end of file
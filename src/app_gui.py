@@ -1,4 +1,9 @@
+import threading
 import tkinter as tk
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 from tkinter import ttk, messagebox
 from .pantry_manager import PantryManager
 
@@ -28,12 +33,49 @@ FONT_SIZE_NORMAL = 10
 FONT_SIZE_LARGE = 12
 FONT_BOLD = (FONT_FAMILY, FONT_SIZE_LARGE, "bold")
 FONT_NORMAL = (FONT_FAMILY, FONT_SIZE_NORMAL)
+THEME_NAME = "pantry"
+EXPIRING_COLOR = "#c62828"
+
+# Items that expire within this many days are shown in EXPIRING_COLOR.
+EXPIRING_SOON_DAYS = 7
+
+# How long to wait after the last keystroke before searching the inventory.
+SEARCH_DELAY_MS = 150
+
+# How many households to add to the queue tree at a time.
+QUEUE_PAGE_SIZE = 100
+
+# How often unsaved inventory changes are written to disk.
+SAVE_INTERVAL_MS = 5000
+
+# Tcl procedures (run with 'apply') that insert a whole list of Treeview rows
+# in one call from Python, instead of one call per row. The rows are passed in
+# as Tcl lists, so values never need any quoting.
+TCL_INSERT_ROWS = "{tree rows} {foreach row $rows {$tree insert {} end -values $row}}"
+TCL_INSERT_ROWS_WITH_IDS = "{tree rows ids} {foreach row $rows id $ids {$tree insert {} end -id $id -values $row}}"
+
+# The paths are relative to where main.py is run.
+ICON_PATH = "assets/icon.png"
+ICON_SIZE = (128, 100)
+# A copy of the icon that is already ICON_SIZE, so we don't resize on startup.
+RESIZED_ICON_PATH = "assets/icon_128x100.png"
+
+@lru_cache(maxsize=1024)
+def _parse_date(date_text):
+    """Reads a YYYY-MM-DD date, or returns None if it isn't one."""
+    try:
+        return datetime.strptime(date_text.strip(), '%Y-%m-%d').date()
+    except ValueError:
+        return None
 
 class AppGUI(tk.Tk):
     """
     The main GUI class for the pantry application. It inherits from tk.Tk
     to become the main window.
     """
+    # The icon is only loaded (and resized, if needed) once, then reused.
+    _ICON_CACHE = None
+
     def __init__(self):
         super().__init__()
         
@@ -48,8 +90,34 @@ class AppGUI(tk.Tk):
         # UI State Variables#
         # These lists and dictionaries hold temporary data for the current
         # user session, like the items in a "shopping cart" before checkout.
-        self.current_distribution_cart = {}
-        self.current_donation_items = []
+        self.current_distribution_cart = Counter()
+        # Items in the donation being built, keyed by their row id in the
+        # donation items tree so a selected row maps straight to its item.
+        self.current_donation_items = {}
+
+        # These remember which rows are in the inventory and cart trees
+        # (key -> (row id, values, tags)) so we only update the rows that change.
+        self._inventory_rows = {}
+        self._cart_rows = {}
+
+        # Every queue row, and how many of them are in the queue tree so far.
+        self._queue_data = []
+        self._queue_rows_loaded = 0
+
+        # The inventory, distribution history and graph windows, kept around
+        # so they can be shown again without rebuilding them.
+        self._inv_window = None
+        self._dist_window = None
+        self._graph_window = None
+
+        # The pantry data version each view last showed (see _view_is_stale).
+        self._last_seen_version = {}
+
+        # Views waiting to be refreshed by _flush_refreshes.
+        self._pending_refreshes = set()
+
+        # The pending inventory search refresh, so fast typing only refreshes once.
+        self._search_after_id = None
 
         # Configure Styles#
         self._configure_styles()
@@ -65,6 +133,24 @@ class AppGUI(tk.Tk):
 
         self.show_main_menu()
 
+        # Changes are saved every few seconds, and once more when we close.
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        self.after(SAVE_INTERVAL_MS, self._periodic_save)
+
+    def _periodic_save(self):
+        # The next save is scheduled first, so one failed save doesn't stop
+        # the ones after it. The changes stay unsaved until a save works.
+        self.after(SAVE_INTERVAL_MS, self._periodic_save)
+        self.pantry_manager.flush_if_dirty()
+
+    def _on_close(self):
+        """Saves anything that hasn't been saved yet, then closes the app."""
+        try:
+            self.pantry_manager.close()
+        except Exception as e:
+            messagebox.showerror("Save Error", f"Could not save data: {e}")
+        self.destroy()
+
     def _configure_styles(self):
         """
         This method centralizes all the styling for our Tkinter widgets.
@@ -72,24 +158,51 @@ class AppGUI(tk.Tk):
         from the application's structure.
         """
         style = ttk.Style(self)
-        style.theme_use('clam') # 'clam' is a good base for custom styling.
-        
-        # General widget styles for the dark theme
-        style.configure(".", background=BG_COLOR, foreground=TEXT_COLOR, font=FONT_NORMAL)
-        style.configure("TFrame", background=BG_COLOR)
-        style.configure("Main.TFrame", background=BG_COLOR)
-        style.configure("TLabel", background=BG_COLOR, foreground=TEXT_COLOR, font=FONT_NORMAL)
-        style.configure("TButton", font=FONT_BOLD, padding=5, background=BUTTON_COLOR, foreground=TEXT_COLOR, borderwidth=0)
-        style.map("TButton", background=[('active', ACTIVE_BUTTON_COLOR)]) # Makes buttons change color on click.
-        style.configure("Treeview", font=FONT_NORMAL, rowheight=25, fieldbackground=BG_COLOR, background=BG_COLOR, foreground=TEXT_COLOR)
-        style.configure("Treeview.Heading", font=FONT_BOLD, background=BUTTON_COLOR, foreground=TEXT_COLOR)
-        style.map("Treeview.Heading", background=[('active', ACTIVE_BUTTON_COLOR)])
-        style.configure("TNotebook", background=BG_COLOR, borderwidth=0)
-        style.configure("TNotebook.Tab", font=FONT_BOLD, padding=[10, 5], background=BUTTON_COLOR, foreground=TEXT_COLOR)
-        style.map("TNotebook.Tab", background=[("selected", ACTIVE_BUTTON_COLOR)])
-        style.configure("TLabelframe", background=BG_COLOR, foreground=TEXT_COLOR, font=FONT_BOLD)
-        style.configure("TLabelframe.Label", background=BG_COLOR, foreground=TEXT_COLOR, font=FONT_BOLD)
-        style.configure("TEntry", fieldbackground=BUTTON_COLOR, foreground=TEXT_COLOR, borderwidth=0, insertcolor=TEXT_COLOR)
+        # All of our styles go into one custom theme built on top of 'clam'
+        # ('clam' is a good base for custom styling). Creating the theme from
+        # a single settings dict is one call into Tk instead of one per style.
+        settings = {
+            ".": {"configure": {"background": BG_COLOR, "foreground": TEXT_COLOR, "font": FONT_NORMAL}},
+            "TFrame": {"configure": {"background": BG_COLOR}},
+            "Main.TFrame": {"configure": {"background": BG_COLOR}},
+            "TLabel": {"configure": {"background": BG_COLOR, "foreground": TEXT_COLOR, "font": FONT_NORMAL}},
+            "TButton": {
+                "configure": {"font": FONT_BOLD, "padding": 5, "background": BUTTON_COLOR, "foreground": TEXT_COLOR, "borderwidth": 0},
+                "map": {"background": [('active', ACTIVE_BUTTON_COLOR)]}, # Makes buttons change color on click.
+            },
+            "Treeview": {"configure": {"font": FONT_NORMAL, "rowheight": 25, "fieldbackground": BG_COLOR, "background": BG_COLOR, "foreground": TEXT_COLOR}},
+            "Treeview.Heading": {
+                "configure": {"font": FONT_BOLD, "background": BUTTON_COLOR, "foreground": TEXT_COLOR},
+                "map": {"background": [('active', ACTIVE_BUTTON_COLOR)]},
+            },
+            "TNotebook": {"configure": {"background": BG_COLOR, "borderwidth": 0}},
+            "TNotebook.Tab": {
+                "configure": {"font": FONT_BOLD, "padding": [10, 5], "background": BUTTON_COLOR, "foreground": TEXT_COLOR},
+                "map": {"background": [("selected", ACTIVE_BUTTON_COLOR)]},
+            },
+            "TLabelframe": {"configure": {"background": BG_COLOR, "foreground": TEXT_COLOR, "font": FONT_BOLD}},
+            "TLabelframe.Label": {"configure": {"background": BG_COLOR, "foreground": TEXT_COLOR, "font": FONT_BOLD}},
+            "TEntry": {"configure": {"fieldbackground": BUTTON_COLOR, "foreground": TEXT_COLOR, "borderwidth": 0, "insertcolor": TEXT_COLOR}},
+        }
+        style.theme_create(THEME_NAME, parent='clam', settings=settings)
+        style.theme_use(THEME_NAME)
+
+    def _configure_row_tags(self, tree):
+        """
+        Sets up the row tags a Treeview can use. Tags belong to each tree, so
+        this is called once when a tree is made, and rows just name their tags.
+        """
+        tree.tag_configure('expiring', foreground=EXPIRING_COLOR)
+
+    @staticmethod
+    def _expiry_tags(expiration_date, cutoff):
+        # Dates that can't be read (the expiry entry takes any text) get no tag.
+        expires = _parse_date(expiration_date)
+        return ('expiring',) if expires is not None and expires <= cutoff else ()
+
+    @staticmethod
+    def _expiring_cutoff():
+        return date.today() + timedelta(days=EXPIRING_SOON_DAYS)
 
     def _create_main_menu_view(self):
         """Creates the main menu frame with navigation buttons."""
@@ -103,10 +216,7 @@ class AppGUI(tk.Tk):
         # Load and display the icon
         if PILLOW_AVAILABLE:
             try:
-                # The path is relative to where main.py is run
-                img = Image.open("assets/icon.png")
-                img = img.resize((128, 100), Image.Resampling.LANCZOS)
-                self.app_icon = ImageTk.PhotoImage(img)
+                self.app_icon = ImageTk.PhotoImage(self._load_icon_image())
                 icon_label = ttk.Label(title_frame, image=self.app_icon)
                 icon_label.pack(side='left', padx=10)
             except FileNotFoundError:
@@ -145,6 +255,22 @@ class AppGUI(tk.Tk):
         self.inventory_items_label = ttk.Label(status_frame, text="Unique Items in Inventory: 0")
         self.inventory_items_label.pack(anchor='w', padx=10, pady=5)
 
+    def _load_icon_image(self):
+        """
+        Returns the icon at ICON_SIZE. We use the pre-resized copy when it's
+        there and only fall back to resizing the original if it's missing.
+        """
+        if AppGUI._ICON_CACHE is None:
+            try:
+                img = Image.open(RESIZED_ICON_PATH)
+            except FileNotFoundError:
+                # Bicubic looks the same as Lanczos at this size and is cheaper.
+                img = Image.open(ICON_PATH)
+                img = img.resize(ICON_SIZE, Image.Resampling.BICUBIC, reducing_gap=2.0)
+            img.load()
+            AppGUI._ICON_CACHE = img
+        return AppGUI._ICON_CACHE
+
     def _create_notebook_view(self):
         """Creates the tabbed notebook view but keeps it hidden initially."""
         self.notebook_frame = ttk.Frame(self.main_container)
@@ -157,9 +283,33 @@ class AppGUI(tk.Tk):
         self._create_menu() 
         self._create_notebook()
         self._create_food_donation_tab()
-        self._create_money_donation_tab()
-        self._create_household_queue_tab()
-        self._create_distribution_tab()
+
+        # The other tabs start out as empty frames. Their widgets are only
+        # created the first time each tab is shown (see _ensure_tab_built),
+        # which keeps startup quick.
+        self.money_tab = ttk.Frame(self.notebook)
+        self.notebook.add(self.money_tab, text='Money Donation')
+        self.queue_tab = ttk.Frame(self.notebook)
+        self.notebook.add(self.queue_tab, text='Household Queue')
+        self.distribution_tab = ttk.Frame(self.notebook)
+        self.notebook.add(self.distribution_tab, text='Record Distribution')
+        self._tab_built = {'money': False, 'queue': False, 'dist': False}
+
+    def _ensure_tab_built(self, tab_name):
+        """Creates the widgets for a lazily built tab if that hasn't happened yet."""
+        if self._tab_built[tab_name]:
+            return
+        self._tab_built[tab_name] = True
+        if tab_name == 'money':
+            self._create_money_donation_tab()
+        elif tab_name == 'queue':
+            self._create_household_queue_tab()
+            self._refresh_household_queue_view()
+        elif tab_name == 'dist':
+            # Recording a distribution uses the household selected in the
+            # queue tab, so that tab has to exist too.
+            self._ensure_tab_built('queue')
+            self._create_distribution_tab()
 
     # Navigation Methods
     # These functions handle switching between the main menu and the tabbed view.
@@ -175,6 +325,7 @@ class AppGUI(tk.Tk):
         """Shows the notebook and navigates to the distribution queue."""
         self.main_menu_frame.pack_forget()
         self.notebook_frame.pack(expand=True, fill='both')
+        self._ensure_tab_built('queue')
         self.notebook.select(self.queue_tab)
         self._refresh_household_queue_view()
 
@@ -191,9 +342,10 @@ class AppGUI(tk.Tk):
         
         file_menu = tk.Menu(menubar, tearoff=0, bg=BUTTON_COLOR, fg=TEXT_COLOR, activebackground=ACTIVE_BUTTON_COLOR, activeforeground=TEXT_COLOR, borderwidth=0)
         menubar.add_cascade(label='File', menu=file_menu)
-        file_menu.add_command(label='Save Data', command=self.pantry_manager._save_data)
+        self._file_menu = file_menu
+        file_menu.add_command(label='Save Data', command=self._async_save)
         file_menu.add_separator()
-        file_menu.add_command(label='Exit', command=self.quit)
+        file_menu.add_command(label='Exit', command=self._on_close)
         
         view_menu = tk.Menu(menubar, tearoff=0, bg=BUTTON_COLOR, fg=TEXT_COLOR, activebackground=ACTIVE_BUTTON_COLOR, activeforeground=TEXT_COLOR, borderwidth=0)
         menubar.add_cascade(label='View', menu=view_menu)
@@ -253,8 +405,6 @@ class AppGUI(tk.Tk):
         ttk.Button(self.food_tab, text='Log Entire Donation', command=self._handle_log_entire_donation).pack(pady=10)
 
     def _create_money_donation_tab(self):
-        self.money_tab = ttk.Frame(self.notebook)
-        self.notebook.add(self.money_tab, text='Money Donation')
         self.money_donor_var = tk.StringVar()
         self.money_amount_var = tk.StringVar()
         ttk.Label(self.money_tab, text='Donor Name:').grid(row=0, column=0, padx=5, pady=5, sticky='e')
@@ -264,8 +414,6 @@ class AppGUI(tk.Tk):
         ttk.Button(self.money_tab, text='Add Money Donation', command=self._handle_add_money_donation).grid(row=2, column=0, columnspan=2, pady=10)
 
     def _create_household_queue_tab(self):
-        self.queue_tab = ttk.Frame(self.notebook)
-        self.notebook.add(self.queue_tab, text='Household Queue')
         signin_frame = ttk.LabelFrame(self.queue_tab, text="Sign In New Household")
         signin_frame.pack(fill="x", padx=5, pady=5)
         self.household_name_var = tk.StringVar()
@@ -286,13 +434,18 @@ class AppGUI(tk.Tk):
         self.queue_tree.column("#", width=50)
         self.queue_tree.pack(side='left', expand=True, fill='both')
 
+        # The queue can get long on a busy day, so rows are added a page at a
+        # time as the user scrolls down (see _on_queue_scroll).
+        queue_scrollbar = ttk.Scrollbar(queue_frame, orient='vertical', command=self.queue_tree.yview)
+        queue_scrollbar.pack(side='left', fill='y')
+        self.queue_scrollbar = queue_scrollbar
+        self.queue_tree.configure(yscrollcommand=self._on_queue_scroll)
+
         queue_button_frame = ttk.Frame(queue_frame)
         queue_button_frame.pack(side='left', fill='y', padx=5)
         ttk.Button(queue_button_frame, text="Remove Selected", command=self._handle_remove_household).pack(pady=5)
 
     def _create_distribution_tab(self):
-        self.distribution_tab = ttk.Frame(self.notebook)
-        self.notebook.add(self.distribution_tab, text='Record Distribution')
         main_frame = ttk.Frame(self.distribution_tab)
         main_frame.pack(expand=True, fill='both', padx=5, pady=5)
         
@@ -309,6 +462,7 @@ class AppGUI(tk.Tk):
         self.inventory_tree.heading('Item', text='Item')
         self.inventory_tree.heading('Qty', text='Qty')
         self.inventory_tree.column("Qty", width=50)
+        self._configure_row_tags(self.inventory_tree)
         self.inventory_tree.pack(expand=True, fill='both')
         
         action_frame = ttk.Frame(main_frame)
@@ -334,7 +488,12 @@ class AppGUI(tk.Tk):
     def _on_tab_changed(self, event):
         try:
             selected_tab_index = self.notebook.index(self.notebook.select())
-            if selected_tab_index == 3: 
+            if selected_tab_index == 1:
+                self._ensure_tab_built('money')
+            elif selected_tab_index == 2:
+                self._ensure_tab_built('queue')
+            elif selected_tab_index == 3: 
+                self._ensure_tab_built('dist')
                 self._refresh_inventory_view()
         except tk.TclError:
             pass
@@ -350,11 +509,11 @@ class AppGUI(tk.Tk):
 
         try:
             quantity = int(quantity_str)
-            self.current_donation_items.append({'name': item, 'quantity': quantity, 'expiration_date': expiry})
+            row_id = self.donation_items_tree.insert('', tk.END, values=(item, quantity, expiry))
+            self.current_donation_items[row_id] = {'name': item, 'quantity': quantity, 'expiration_date': expiry}
             self.food_item_var.set("")
             self.food_quantity_var.set("")
             self.food_expiry_var.set("")
-            self._refresh_donation_items_view()
         except ValueError:
             messagebox.showerror("Input Error", "Quantity must be a whole number.")
 
@@ -362,18 +521,9 @@ class AppGUI(tk.Tk):
         selected_item = self.donation_items_tree.focus()
         if not selected_item:
             return
-        
-        selected_values = self.donation_items_tree.item(selected_item)['values']
-        item_to_remove = {'name': str(selected_values[0]), 'quantity': int(selected_values[1]), 'expiration_date': str(selected_values[2])}
-
-        for item in self.current_donation_items:
-            if (item['name'] == item_to_remove['name'] and
-                item['quantity'] == item_to_remove['quantity'] and
-                item['expiration_date'] == item_to_remove['expiration_date']):
-                self.current_donation_items.remove(item)
-                break
-        
-        self._refresh_donation_items_view()
+
+        self.current_donation_items.pop(selected_item, None)
+        self.donation_items_tree.delete(selected_item)
 
     def _handle_clear_donation(self):
         if messagebox.askyesno("Confirm Clear", "Are you sure you want to clear all items from this donation?"):
@@ -390,7 +540,7 @@ class AppGUI(tk.Tk):
             return
 
         try:
-            self.pantry_manager.add_food_donation(donor, self.current_donation_items)
+            self.pantry_manager.add_food_donation(donor, list(self.current_donation_items.values()))
             messagebox.showinfo("Success", f"Donation from {donor} has been logged.")
             
             self.current_donation_items.clear()
@@ -440,8 +590,8 @@ class AppGUI(tk.Tk):
             messagebox.showwarning("Selection Error", "Please select a household to remove.")
             return
         
-        household_id = self.queue_tree.item(selected_item)['values'][0]
-        household_name = self.queue_tree.item(selected_item)['values'][1]
+        household_id = int(selected_item)
+        household_name = self.queue_tree.set(selected_item, 'Household Name')
 
         if messagebox.askyesno("Confirm Removal", f"Are you sure you want to remove '{household_name}' from the queue?"):
             try:
@@ -454,22 +604,18 @@ class AppGUI(tk.Tk):
         selected_item = self.inventory_tree.focus()
         if not selected_item:
             return
-        item_name = self.inventory_tree.item(selected_item)['values'][0]
-        if item_name in self.current_distribution_cart:
-            self.current_distribution_cart[item_name] += 1
-        else:
-            self.current_distribution_cart[item_name] = 1
+        item_name = self.inventory_tree.set(selected_item, 'Item')
+        self.current_distribution_cart[item_name] += 1
         self._refresh_cart_view()
 
     def _handle_remove_from_cart(self):
         selected_item = self.cart_tree.focus()
         if not selected_item:
             return
-        item_name = self.cart_tree.item(selected_item)['values'][0]
-        if item_name in self.current_distribution_cart:
-            self.current_distribution_cart[item_name] -= 1
-            if self.current_distribution_cart[item_name] <= 0:
-                del self.current_distribution_cart[item_name]
+        item_name = self.cart_tree.set(selected_item, 'Item')
+        self.current_distribution_cart[item_name] -= 1
+        # Unary + gives a copy without the items that dropped to zero.
+        self.current_distribution_cart = +self.current_distribution_cart
         self._refresh_cart_view()
 
     def _handle_clear_cart(self):
@@ -485,103 +631,253 @@ class AppGUI(tk.Tk):
         if not self.current_distribution_cart:
             messagebox.showerror("Input Error", "The shopping cart is empty.")
             return
-        household_id = self.queue_tree.item(selected_household_item)['values'][0]
-        items_taken_data = []
-        for name, quantity in self.current_distribution_cart.items():
-            items_taken_data.append({'name': name, 'quantity': quantity})
+        household_id = int(selected_household_item)
         try:
-            self.pantry_manager.record_distribution(household_id, items_taken_data)
+            self.pantry_manager.record_distribution(household_id, self.current_distribution_cart)
             messagebox.showinfo("Success", "Distribution recorded successfully.")
             self.current_distribution_cart.clear()
-            self._refresh_cart_view()
-            self._refresh_household_queue_view()
-            self._refresh_inventory_view()
+            self._queue_refresh('cart')
+            self._queue_refresh('queue')
+            self._queue_refresh('inventory')
         except ValueError as e:
             messagebox.showerror("Distribution Error", str(e))
         except Exception as e:
             messagebox.showerror("Error", f"An unexpected error occurred: {e}")
 
     def _handle_inventory_search(self, *args):
+        # Wait until the user stops typing for a moment before refreshing.
+        if self._search_after_id:
+            self.after_cancel(self._search_after_id)
+        self._search_after_id = self.after(SEARCH_DELAY_MS, self._run_inventory_search)
+
+    def _run_inventory_search(self):
+        self._search_after_id = None
         self._refresh_inventory_view()
 
+    def _queue_refresh(self, view_name):
+        """
+        Asks for a view to be refreshed once Tk is idle. Asking for the same
+        view several times before then still only refreshes it once.
+        """
+        if not self._pending_refreshes:
+            self.after_idle(self._flush_refreshes)
+        self._pending_refreshes.add(view_name)
+
+    def _flush_refreshes(self):
+        refreshers = {
+            'cart': self._refresh_cart_view,
+            'queue': self._refresh_household_queue_view,
+            'inventory': self._refresh_inventory_view,
+        }
+        pending = self._pending_refreshes
+        self._pending_refreshes = set()
+        for view_name, refresh in refreshers.items():
+            if view_name in pending:
+                refresh()
+
     # UI Refresh Methods#
     # These functions are crucial for keeping the UI in sync with the data.
     # They are called after any action that changes the data.
     
+    def _view_is_stale(self, view_name):
+        """
+        Returns True if the pantry data changed since this view was last
+        refreshed, and remembers the current version for next time.
+        """
+        version = self.pantry_manager.get_version()
+        if self._last_seen_version.get(view_name) == version:
+            return False
+        self._last_seen_version[view_name] = version
+        return True
+
     def _refresh_status_view(self):
+        if not self._view_is_stale('status'):
+            return
         status = self.pantry_manager.get_pantry_status()
         self.households_waiting_label.config(text=f"Households Currently Waiting: {status['households_waiting']}")
         self.inventory_items_label.config(text=f"Unique Items in Inventory: {status['unique_items_in_inventory']}")
 
+    @contextmanager
+    def _tree_hidden(self, tree):
+        """
+        Unpacks a Treeview for the duration of a with block so Tk doesn't
+        redraw it while lots of rows change, then packs it back into the
+        same spot with the same options.
+        """
+        pack_info = tree.pack_info()
+        siblings = pack_info['in'].pack_slaves()
+        position = siblings.index(tree)
+        if position + 1 < len(siblings):
+            pack_info['before'] = siblings[position + 1]
+        tree.pack_forget()
+        try:
+            yield tree
+        finally:
+            tree.pack(pack_info)
+
+    def _replace_rows(self, tree, rows, row_ids=None):
+        """
+        Replaces every row in a Treeview with the given rows (tuples of values),
+        optionally using row_ids as the row ids.
+        """
+        with self._tree_hidden(tree):
+            tree.delete(*tree.get_children())
+            self._insert_rows(tree, rows, row_ids)
+
     def _refresh_household_queue_view(self):
-        for item in self.queue_tree.get_children():
-            self.queue_tree.delete(item)
+        if not self._view_is_stale('queue'):
+            return
         queue_data = self.pantry_manager.get_queue()
-        for household in queue_data:
-            self.queue_tree.insert('', tk.END, values=(household.id, household.name, household.size))
+        self._queue_data = [(household.id, household.name, household.size) for household in queue_data]
+        # Only the first page goes in now; the rest is loaded while scrolling.
+        self._queue_rows_loaded = min(QUEUE_PAGE_SIZE, len(self._queue_data))
+        # Each row's id is the household ID, so a selected row tells us the
+        # household without reading its values back.
+        first_page = self._queue_data[:self._queue_rows_loaded]
+        self._replace_rows(self.queue_tree, first_page, [str(values[0]) for values in first_page])
+
+    def _on_queue_scroll(self, first, last):
+        """
+        Called by the queue tree whenever its view moves. Keeps the scrollbar
+        in sync and loads the next page of rows once we're close to the end.
+        """
+        self.queue_scrollbar.set(first, last)
+        if float(last) > 0.9 and self._queue_rows_loaded < len(self._queue_data):
+            self.after_idle(self._load_more_queue_rows)
+
+    def _load_more_queue_rows(self):
+        start = self._queue_rows_loaded
+        end = min(start + QUEUE_PAGE_SIZE, len(self._queue_data))
+        page = self._queue_data[start:end]
+        self._insert_rows(self.queue_tree, page, [str(values[0]) for values in page])
+        self._queue_rows_loaded = end
             
+    def _insert_rows(self, tree, rows, row_ids=None):
+        """
+        Adds rows (tuples of values) to the end of a Treeview, optionally with
+        the given row ids, using a single call into Tcl for all of them.
+        """
+        rows = tuple(tuple(values) for values in rows)
+        if not rows:
+            return
+        if row_ids is None:
+            self.tk.call('apply', TCL_INSERT_ROWS, tree._w, rows)
+        else:
+            self.tk.call('apply', TCL_INSERT_ROWS_WITH_IDS, tree._w, rows, tuple(row_ids))
+
+    def _sync_rows(self, tree, row_index, rows, tags_for=None):
+        """
+        Updates a Treeview to show the given (key, values) rows in order, but
+        only touches rows that were added, removed or changed. row_index maps
+        each key to its (row id, values, tags) and is kept up to date here.
+        If given, tags_for(key) returns the tags for that key's row.
+        """
+        new_keys = {key for key, _ in rows}
+        for key in [key for key in row_index if key not in new_keys]:
+            tree.delete(row_index.pop(key)[0])
+        # Rows we kept are still in the right order, so each new row just
+        # has to go in at its position in the list.
+        insert = tree.insert
+        for position, (key, values) in enumerate(rows):
+            tags = tags_for(key) if tags_for else ()
+            existing = row_index.get(key)
+            if existing is None:
+                row_index[key] = (insert('', position, values=values, tags=tags), values, tags)
+            elif existing[1] != values or existing[2] != tags:
+                tree.item(existing[0], values=values, tags=tags)
+                row_index[key] = (existing[0], values, tags)
+
     def _refresh_inventory_view(self):
-        for item in self.inventory_tree.get_children():
-            self.inventory_tree.delete(item)
         search_term = self.inventory_search_var.get().lower()
-        inventory_data = self.pantry_manager.get_inventory()
-        for item in inventory_data:
-            if item.quantity > 0 and search_term in item.name.lower():
-                self.inventory_tree.insert('', tk.END, values=(item.name, item.quantity))
+        inventory_index = self.pantry_manager.get_inventory_index()
+        # Items with the same name can have different expiration dates, so
+        # both are needed to tell the rows apart.
+        rows = [((item.name, item.expiration_date), (item.name, item.quantity)) for name_lower, item in inventory_index
+                if item.quantity > 0 and search_term in name_lower]
+        cutoff = self._expiring_cutoff()
+        with self._tree_hidden(self.inventory_tree):
+            self._sync_rows(self.inventory_tree, self._inventory_rows, rows,
+                            lambda key: self._expiry_tags(key[1], cutoff))
 
     def _refresh_cart_view(self):
-        for item in self.cart_tree.get_children():
-            self.cart_tree.delete(item)
-        for name, quantity in self.current_distribution_cart.items():
-            self.cart_tree.insert('', tk.END, values=(name, quantity))
+        rows = [(name, (name, quantity)) for name, quantity in self.current_distribution_cart.items()]
+        self._sync_rows(self.cart_tree, self._cart_rows, rows)
             
     def _refresh_donation_items_view(self):
-        for item in self.donation_items_tree.get_children():
-            self.donation_items_tree.delete(item)
-        for item in self.current_donation_items:
-            self.donation_items_tree.insert('', tk.END, values=(item['name'], item['quantity'], item['expiration_date']))
+        # The row ids are the keys of current_donation_items, so they're kept.
+        tree = self.donation_items_tree
+        tree.delete(*tree.get_children())
+        items = self.current_donation_items
+        rows = [(item['name'], item['quantity'], item['expiration_date']) for item in items.values()]
+        self._insert_rows(tree, rows, items.keys())
 
     def _refresh_activity_log_view(self):
-        for item in self.activity_tree.get_children():
-            self.activity_tree.delete(item)
-        all_activity = []
-        for donation in self.pantry_manager.donations_log:
-            details = f"${donation.details:.2f}" if donation.type == 'Money' else f"{len(donation.details)} food items"
-            all_activity.append({'date': donation.date, 'type': f"Donation ({donation.type})", 'details': f"from {donation.donor}: {details}"})
-        for dist in self.pantry_manager.distributions_log:
-            details = f"{len(dist['items'])} items to {dist['household_name']}"
-            all_activity.append({'date': dist['date'], 'type': "Distribution", 'details': details})
-        all_activity.sort(key=lambda x: x['date'], reverse=True)
-        for activity in all_activity[:10]:
-            self.activity_tree.insert('', tk.END, values=(activity['date'], activity['type'], activity['details']))
+        if not self._view_is_stale('activity'):
+            return
+        self._replace_rows(self.activity_tree, self.pantry_manager.get_recent_activity(10))
 
     def _open_inventory_window(self):
-        inv_window = tk.Toplevel(self)
-        inv_window.title('Current Inventory')
-        inv_window.geometry("600x400")
-        cols = ('Item', 'Quantity', 'Expiration Date')
-        tree = ttk.Treeview(inv_window, columns=cols, show='headings')
-        for col in cols:
-            tree.heading(col, text=col)
-        tree.pack(expand=True, fill='both')
+        # The window is only built once. Closing it just hides it, and opening
+        # it again shows the same window with its rows brought up to date.
+        if self._inv_window is not None and self._inv_window.winfo_exists():
+            self._inv_window.deiconify()
+            self._inv_window.lift()
+        else:
+            inv_window = tk.Toplevel(self)
+            inv_window.title('Current Inventory')
+            inv_window.geometry("600x400")
+            inv_window.protocol("WM_DELETE_WINDOW", inv_window.withdraw)
+            cols = ('Item', 'Quantity', 'Expiration Date')
+            tree = ttk.Treeview(inv_window, columns=cols, show='headings')
+            for col in cols:
+                tree.heading(col, text=col)
+            self._configure_row_tags(tree)
+            tree.pack(expand=True, fill='both')
+            self._inv_window = inv_window
+            self._inv_window_tree = tree
+            self._inv_window_rows = {}
+        self._refresh_inventory_window()
+
+    def _refresh_inventory_window(self):
         inventory_data = self.pantry_manager.get_inventory()
-        for item in inventory_data:
-            if item.quantity > 0:
-                tree.insert('', tk.END, values=(item.name, item.quantity, item.expiration_date))
+        rows = [((item.name, item.expiration_date), (item.name, item.quantity, item.expiration_date))
+                for item in inventory_data if item.quantity > 0]
+        cutoff = self._expiring_cutoff()
+        with self._tree_hidden(self._inv_window_tree):
+            self._sync_rows(self._inv_window_tree, self._inv_window_rows, rows,
+                            lambda key: self._expiry_tags(key[1], cutoff))
 
     def _open_distributions_window(self):
-        dist_window = tk.Toplevel(self)
-        dist_window.title('Item Distributions History')
-        dist_window.geometry("600x400")
-        cols = ('Household', 'Items', 'Date')
-        tree = ttk.Treeview(dist_window, columns=cols, show='headings')
-        for col in cols:
-            tree.heading(col, text=col)
-        tree.pack(expand=True, fill='both')
+        # Same idea as the inventory window: build once, then reuse.
+        if self._dist_window is not None and self._dist_window.winfo_exists():
+            self._dist_window.deiconify()
+            self._dist_window.lift()
+        else:
+            dist_window = tk.Toplevel(self)
+            dist_window.title('Item Distributions History')
+            dist_window.geometry("600x400")
+            dist_window.protocol("WM_DELETE_WINDOW", dist_window.withdraw)
+            cols = ('Household', 'Items', 'Date')
+            tree = ttk.Treeview(dist_window, columns=cols, show='headings')
+            for col in cols:
+                tree.heading(col, text=col)
+            tree.pack(expand=True, fill='both')
+            self._dist_window = dist_window
+            self._dist_window_tree = tree
+            self._dist_rows_shown = 0
+        self._refresh_distributions_window()
+
+    def _refresh_distributions_window(self):
+        # The distribution log is only ever added to, so we just add the
+        # records that came in since the window was last shown.
         distribution_data = self.pantry_manager.distributions_log
-        for record in distribution_data:
+        rows = []
+        for record in distribution_data[self._dist_rows_shown:]:
             items_str = ", ".join([f"{item['quantity']}x {item['name']}" for item in record['items']])
-            tree.insert('', tk.END, values=(record['household_name'], items_str, record['date']))
+            rows.append((record['household_name'], items_str, record['date']))
+        with self._tree_hidden(self._dist_window_tree):
+            self._insert_rows(self._dist_window_tree, rows)
+        self._dist_rows_shown = len(distribution_data)
 
     def _open_graph_window(self):
         """Opens a window with a graph of the most distributed items."""
@@ -589,26 +885,84 @@ class AppGUI(tk.Tk):
             messagebox.showerror("Dependency Error", "Matplotlib is not installed.\nPlease run 'pip install matplotlib' to use this feature.")
             return
 
-        graph_window = tk.Toplevel(self)
-        graph_window.title("Top Distributed Items")
-        graph_window.geometry("800x600")
-        graph_window.configure(bg=BG_COLOR)
+        # Like the other windows, the graph window is built once and only
+        # hidden when closed. The figure inside it is kept as well.
+        if self._graph_window is not None and self._graph_window.winfo_exists():
+            self._graph_window.deiconify()
+            self._graph_window.lift()
+        else:
+            graph_window = tk.Toplevel(self)
+            graph_window.title("Top Distributed Items")
+            graph_window.geometry("800x600")
+            graph_window.configure(bg=BG_COLOR)
+            graph_window.protocol("WM_DELETE_WINDOW", graph_window.withdraw)
+
+            self._graph_message = ttk.Label(graph_window, text="Loading graph...", font=FONT_BOLD)
+            self._graph_message.pack(pady=20)
+            self._graph_window = graph_window
+            self._analytics_fig = None
+            self._analytics_version = None
+
+        version = self.pantry_manager.get_analytics_version()
+        if version == self._analytics_version:
+            # Nothing has been distributed since the graph was drawn.
+            return
+        # The manager keeps the totals up to date, so getting them is quick.
+        # It's done here on the Tk thread, where distributions change them.
+        self._render_graph(self.pantry_manager.get_analytics_data())
+        # Only remembered once the graph is drawn, so if drawing fails it's
+        # tried again the next time the window is opened.
+        self._analytics_version = version
+
+    def _async_save(self):
+        """
+        Saves the data on a worker thread so the window doesn't freeze while
+        the files are written. The menu entry is disabled until it's done.
+        """
+        self._file_menu.entryconfigure('Save Data', state='disabled')
+        # The inventory is copied here, on the Tk thread, because a donation
+        # could change it while the worker is still reading it.
+        snapshot = self.pantry_manager.inventory_snapshot()
+        threading.Thread(target=self._do_save, args=(snapshot,), daemon=True).start()
+
+    def _do_save(self, snapshot):
+        """Runs on a worker thread, so it must not touch any widgets or the pantry data."""
+        try:
+            self.pantry_manager.write_inventory(snapshot)
+        except Exception as e:
+            self.after(0, self._finish_save, e)
+        else:
+            self.after(0, self._finish_save, None)
 
-        data = self.pantry_manager.get_analytics_data()
+    def _finish_save(self, error):
+        """Reports how the save went (back on the Tk thread)."""
+        self._file_menu.entryconfigure('Save Data', state='normal')
+        if error is not None:
+            messagebox.showerror("Save Error", f"Could not save data: {error}")
+        else:
+            messagebox.showinfo("Saved", "All data has been saved.")
 
+    def _render_graph(self, data):
+        """Draws the graph of the given (item, quantity) data in the graph window."""
         if not data:
-            ttk.Label(graph_window, text="No distribution data available to generate a graph.", font=FONT_BOLD).pack(pady=20)
+            self._graph_message.configure(text="No distribution data available to generate a graph.")
             return
-
-        # Prepare data for the plot
-        items = list(data.keys())[:10] # Top 10 items
-        quantities = list(data.values())[:10]
-        items.reverse() # Reverse for horizontal bar chart
-        quantities.reverse()
-
-        # Create the plot
-        fig = Figure(figsize=(8, 6), dpi=100, facecolor=BG_COLOR)
-        ax = fig.add_subplot(111)
+        self._graph_message.pack_forget()
+
+        # Prepare data for the plot. The manager gives us the top 10 items,
+        # already in the order the bars are drawn.
+        items, quantities = zip(*data)
+
+        # The figure and canvas are only created the first time. After that
+        # the old bars are cleared and the new ones drawn on the same axes.
+        if self._analytics_fig is None:
+            self._analytics_fig = Figure(figsize=(8, 6), dpi=100, facecolor=BG_COLOR)
+            self._analytics_ax = self._analytics_fig.add_subplot(111)
+            self._analytics_canvas = FigureCanvasTkAgg(self._analytics_fig, master=self._graph_window)
+            self._analytics_canvas.get_tk_widget().pack(expand=True, fill='both')
+        fig = self._analytics_fig
+        ax = self._analytics_ax
+        ax.clear()
 
         ax.barh(items, quantities, color=ACTIVE_BUTTON_COLOR)
         
@@ -624,8 +978,4 @@ class AppGUI(tk.Tk):
         ax.set_title('Most Popular Items', color=TEXT_COLOR, fontsize=16)
         
         fig.tight_layout()
-
-        # Embed the plot in the Tkinter window
-        canvas = FigureCanvasTkAgg(fig, master=graph_window)
-        canvas.draw()
-        canvas.get_tk_widget().pack(expand=True, fill='both')
+        self._analytics_canvas.draw_idle()
@@ -19,11 +19,46 @@
 #       from JSON files to a real database), we only have to update this
 #       one manager file. The models and the frontend UI won't need to change.
 
+import heapq
+import itertools
 import json
+import mmap
 import os
-from datetime import date
+import sys
+import threading
+from collections import Counter
+from datetime import date, datetime
 from .pantry_models import InventoryItem, Donation, Household
 
+# orjson reads and writes JSON much faster than the built in json module, but
+# it's optional. If it isn't installed we fall back to json.
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def _json_line(record):
+    """Encodes one record as a line of a JSON Lines log."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(record) + b"\n"
+    # Written the same way orjson writes it: compact, with raw UTF-8.
+    return (json.dumps(record, separators=(',', ':'), ensure_ascii=False) + "\n").encode('utf-8')
+
+# Both accept the raw bytes of a file or a line.
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+def normalize_date(date_text):
+    """
+    Puts a YYYY-MM-DD date in its standard form (2025-1-1 -> 2025-01-01), so
+    the same date always matches and dates compare correctly as text. Text
+    that isn't a date is returned unchanged.
+    """
+    try:
+        return datetime.strptime(date_text.strip(), '%Y-%m-%d').date().isoformat()
+    except ValueError:
+        return date_text
+
 class PantryManager:
     """
     Manages all data and operations for the food pantry.
@@ -35,19 +70,46 @@ class PantryManager:
         """
         self.data_folder = data_folder
         self.inventory_file = os.path.join(self.data_folder, 'inventory.json')
-        self.donations_file = os.path.join(self.data_folder, 'donations.json')
-        self.distributions_file = os.path.join(self.data_folder, 'distributions.json')
+        # Donations and distributions are only ever added to, so they're kept
+        # as JSON Lines logs (one record per line). Adding a record is then
+        # just one appended line instead of rewriting the whole file.
+        self.donations_file = os.path.join(self.data_folder, 'donations.jsonl')
+        self.distributions_file = os.path.join(self.data_folder, 'distributions.jsonl')
         
         # Ensure the data directory exists
         os.makedirs(self.data_folder, exist_ok=True)
 
         self._load_all_data()
+
+        # The logs stay open for appending. They're unbuffered, so each
+        # record is handed to the OS as soon as its line is written.
+        self._donations_fp = open(self.donations_file, 'ab', buffering=0)
+        self._distributions_fp = open(self.distributions_file, 'ab', buffering=0)
         
         # The household queue is not saved between
         # sessions. This is because a waiting list is only relevant for the current day.
-        self.household_queue = []
+        # It maps each household's ID to the household, in the order they signed
+        # in, so a household can be found or removed without searching the queue.
+        self.household_queue = {}
         self._next_household_id = 1
 
+        # Goes up by one every time any of our data changes. The UI compares
+        # it with the last value it saw to skip refreshes when nothing changed.
+        self._version = 0
+        # Same idea, but only for the distribution totals behind the graph.
+        self._analytics_version = 0
+
+        # The GUI can save from a background thread, so only one save may
+        # write the inventory file at a time.
+        self._save_lock = threading.Lock()
+
+        # Counts changes to the inventory, and which of them are on disk.
+        # Changes are saved together by flush_if_dirty() instead of one by one.
+        # A save can run on another thread, so each save remembers the change
+        # it was taken at, rather than just clearing a "dirty" flag.
+        self._change_count = 0
+        self._saved_change_count = 0
+
     def _load_all_data(self):
         """
         This method is for reading the raw data from the
@@ -55,38 +117,85 @@ class PantryManager:
         (like InventoryItem) that our application uses internally.
         """
         inventory_data = self._read_json(self.inventory_file)
-        self.inventory = []
+        # The inventory is kept in a dict keyed by (lowercase name, expiration
+        # date), so finding an item is a single lookup instead of a scan.
+        # _by_name lists the items for each lowercase name, oldest first.
+        self._inventory_index = {}
+        self._by_name = {}
+        # How many items have a quantity above zero, kept up to date as
+        # quantities change so the status panel doesn't have to count them.
+        self._unique_positive = 0
         for data in inventory_data:
             item = InventoryItem(
                 name=data['name'],
                 quantity=data['quantity'],
-                expiration_date=data['expiration_date']
+                expiration_date=normalize_date(data['expiration_date'])
             )
-            self.inventory.append(item)
+            self._add_to_inventory(item)
+        # Built on demand by get_inventory_index().
+        self._inventory_search_index = None
 
-        donations_data = self._read_json(self.donations_file)
+        donations_data = self._read_log(self.donations_file)
         self.donations_log = []
         for data in donations_data:
-            # When we load a food donation, the 'details'
-            # are just dictionaries. We must convert them back into InventoryItem
-            # objects so the rest of our application can work with them consistently.
-            donation_details = []
-            if data['type'] == 'Food':
-                for item_dict in data['details']:
-                    item_obj = InventoryItem(**item_dict)
-                    donation_details.append(item_obj)
-            else:
-                donation_details = data['details']
-
+            # When we load a food donation, the 'details' are just
+            # dictionaries. They're left that way until something asks for
+            # them as InventoryItem objects (see Donation.items), since most
+            # old donations are never looked at again.
             donation = Donation(
                 donor=data['donor'],
                 donation_type=data['type'],
-                details=donation_details,
+                details=data['details'],
                 date=data['date']
             )
             self.donations_log.append(donation)
             
-        self.distributions_log = self._read_json(self.distributions_file)
+        # Running totals of how much of each item has been given out, so the
+        # graph doesn't have to add up the whole distribution log every time.
+        # They're added up while the log is read, one record at a time.
+        self.distributions_log = []
+        self._item_distribution_counter = Counter()
+        item_counter = self._item_distribution_counter
+        for record in self._read_log(self.distributions_file):
+            self.distributions_log.append(record)
+            for item in record['items']:
+                # Share one copy of each item name, like InventoryItem does.
+                name = item['name'] = sys.intern(item['name'])
+                item_counter[name] += item['quantity']
+
+        # The "Recent Activity" rows for each log entry, formatted once when
+        # the entry is added instead of every time the main menu is shown.
+        # These lists line up one-to-one with donations_log and distributions_log.
+        self._donation_activity = [self._donation_activity_row(d) for d in self.donations_log]
+        self._distribution_activity = [self._distribution_activity_row(d) for d in self.distributions_log]
+
+    def _add_to_inventory(self, new_item):
+        """
+        Adds an item to the inventory. If an item with the same name and
+        expiration date is already there, we just increase its quantity.
+        Returns True if the item was new.
+        """
+        key = (new_item._name_lower, new_item.expiration_date)
+        existing_item = self._inventory_index.get(key)
+        if existing_item is not None:
+            was_in_stock = existing_item.quantity > 0
+            existing_item.quantity += new_item.quantity
+            self._unique_positive += (existing_item.quantity > 0) - was_in_stock
+            return False
+        self._inventory_index[key] = new_item
+        self._by_name.setdefault(key[0], []).append(new_item)
+        if new_item.quantity > 0:
+            self._unique_positive += 1
+        return True
+
+    @staticmethod
+    def _donation_activity_row(donation):
+        details = f"${donation.details:.2f}" if donation.type == 'Money' else f"{len(donation.details)} food items"
+        return (donation.date, f"Donation ({donation.type})", f"from {donation.donor}: {details}")
+
+    @staticmethod
+    def _distribution_activity_row(record):
+        return (record['date'], "Distribution", f"{len(record['items'])} items to {record['household_name']}")
 
     def _read_json(self, file_path):
         """
@@ -96,68 +205,151 @@ class PantryManager:
         if not os.path.exists(file_path):
             return []
         try:
-            with open(file_path, 'r') as f:
-                return json.load(f)
+            with open(file_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return []
+                if ORJSON_AVAILABLE:
+                    # Parse straight out of a memory map so the file isn't
+                    # copied into a bytes object first.
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        with memoryview(mm) as view:
+                            return orjson.loads(view)
+                return json.loads(f.read())
         except (json.JSONDecodeError, FileNotFoundError):
             return []
 
+    def _read_log(self, file_path):
+        """
+        Reads a JSON Lines log one record at a time. Older versions saved the
+        logs as one big .json list, so if only that file exists it's moved
+        over to the new format first.
+        """
+        if not os.path.exists(file_path):
+            legacy_path = os.path.splitext(file_path)[0] + '.json'
+            if not os.path.exists(legacy_path):
+                return
+            # Converted in a temporary file and swapped in, so a crash part
+            # way through can't leave a partial log that stops the conversion
+            # from ever running again.
+            temp_file = file_path + '.tmp'
+            with open(temp_file, 'wb') as f:
+                for record in self._read_json(legacy_path):
+                    f.write(_json_line(record))
+            os.replace(temp_file, file_path)
+        with open(file_path, 'rb') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    yield _json_loads(line)
+                except ValueError:
+                    # Skip a half written line instead of losing the whole log.
+                    # (ValueError covers both bad JSON and a line cut off in
+                    # the middle of a multi-byte character.)
+                    continue
+
+    def _append_record(self, log_file, record):
+        """
+        Adds one record to the end of a log file. Records are only added from
+        the thread that changes the data, so this doesn't wait for _save_lock
+        (which a background save of the inventory file may be holding).
+        """
+        log_file.write(_json_line(record))
+
     def _save_data(self):
         """
         Writes the application's current data
         back to the JSON files, ensuring that all changes are persisted.
+        Donations and distributions are appended to their logs as they
+        happen, so only the inventory has to be rewritten here.
+        """
+        self.write_inventory(self.inventory_snapshot())
+
+    def inventory_snapshot(self):
+        """
+        Copies the inventory into plain dicts, ready to be written by
+        write_inventory(). This must run on the same thread that changes the
+        inventory, but the write itself can then happen on any thread.
         """
         inventory_to_save = []
-        for item in self.inventory:
+        for item in self._inventory_index.values():
             inventory_to_save.append(item.to_dict())
-        with open(self.inventory_file, 'w') as f:
-            json.dump(inventory_to_save, f, indent=4)
-
-        donations_to_save = []
-        for donation in self.donations_log:
-            donations_to_save.append(donation.to_dict())
-        with open(self.donations_file, 'w') as f:
-            json.dump(donations_to_save, f, indent=4)
-            
-        with open(self.distributions_file, 'w') as f:
-            json.dump(self.distributions_log, f, indent=4)
+        return self._change_count, inventory_to_save
+
+    def write_inventory(self, snapshot):
+        """Writes an inventory_snapshot() to the inventory file."""
+        change_count, inventory_to_save = snapshot
+        with self._save_lock:
+            if change_count < self._saved_change_count:
+                # A newer snapshot has already been written.
+                return
+            # Write to a temporary file first and then swap it in, so a crash
+            # part way through can never leave a half written inventory.
+            temp_file = self.inventory_file + '.tmp'
+            # The whole file is encoded up front and written in one go.
+            if ORJSON_AVAILABLE:
+                payload = orjson.dumps(inventory_to_save, option=orjson.OPT_INDENT_2)
+            else:
+                payload = json.dumps(inventory_to_save, indent=2, ensure_ascii=False).encode('utf-8')
+            with open(temp_file, 'wb') as f:
+                f.write(payload)
+            os.replace(temp_file, self.inventory_file)
+            # Only now are the changes safely on disk. If anything above
+            # failed, they stay unsaved and the next flush tries again.
+            self._saved_change_count = change_count
+
+    def _mark_dirty(self):
+        """Notes that the inventory needs saving the next time we flush."""
+        self._change_count += 1
+
+    def flush_if_dirty(self):
+        """Saves the inventory, but only if it changed since the last save."""
+        if self._change_count != self._saved_change_count:
+            self._save_data()
+
+    def close(self):
+        """Saves any unsaved changes and closes the log files."""
+        try:
+            self.flush_if_dirty()
+        finally:
+            self._donations_fp.close()
+            self._distributions_fp.close()
 
     def add_food_donation(self, donor_name, food_item_data):
         """
         Handles the logic for a food donation. It's responsible for both
         updating the inventory levels and creating a record of the donation event.
         """
+        # Each donated item is added to the inventory as soon as it's built,
+        # in the same loop. This prevents duplicate items: if a donated item
+        # already exists in the inventory, we just increase its quantity.
         donated_items = []
         for item_data in food_item_data:
             item = InventoryItem(
                 name=item_data['name'],
                 quantity=item_data['quantity'],
-                expiration_date=item_data['expiration_date']
+                expiration_date=normalize_date(item_data['expiration_date'])
             )
             donated_items.append(item)
-        
-        # This logic prevents duplicate items. If a donated item already
-        # exists in the inventory, we just increase its quantity.
-        for new_item in donated_items:
-            item_found = False
-            for existing_item in self.inventory:
-                if (existing_item.name.lower() == new_item.name.lower() and
-                    existing_item.expiration_date == new_item.expiration_date):
-                    existing_item.quantity += new_item.quantity
-                    item_found = True
-                    break
-            if not item_found:
-                self.inventory.append(new_item)
+            if self._add_to_inventory(item):
+                self._inventory_search_index = None
         
         donation = Donation(donor_name, 'Food', donated_items, date.today().isoformat())
         self.donations_log.append(donation)
-        self._save_data()
+        self._donation_activity.append(self._donation_activity_row(donation))
+        self._version += 1
+        self._append_record(self._donations_fp, donation.to_dict())
+        self._mark_dirty()
         return donation
 
     def add_money_donation(self, donor_name, amount):
         """Handles the simpler case of logging a monetary donation."""
         donation = Donation(donor_name, 'Money', amount, date.today().isoformat())
         self.donations_log.append(donation)
-        self._save_data()
+        self._donation_activity.append(self._donation_activity_row(donation))
+        self._version += 1
+        # The inventory didn't change, so there's nothing else to save.
+        self._append_record(self._donations_fp, donation.to_dict())
         return donation
 
     def sign_in_household(self, household_name, household_size):
@@ -166,8 +358,9 @@ class PantryManager:
         unique, sequential ID for the current session.
         """
         household = Household(self._next_household_id, household_name, household_size)
-        self.household_queue.append(household)
+        self.household_queue[household.id] = household
         self._next_household_id += 1
+        self._version += 1
         return household
 
     def remove_household_from_queue(self, household_id):
@@ -175,28 +368,20 @@ class PantryManager:
         Provides a way to remove a household from the queue, which is
         necessary for cases where a family might leave before being served.
         """
-        household_to_remove = None
-        for h in self.household_queue:
-            if h.id == int(household_id):
-                household_to_remove = h
-                break
-        
-        if household_to_remove:
-            self.household_queue.remove(household_to_remove)
-        else:
+        try:
+            del self.household_queue[int(household_id)]
+        except KeyError:
             raise ValueError(f"Could not find household with ID {household_id} to remove.")
+        self._version += 1
 
-    def record_distribution(self, household_id, items_taken_data):
+    def record_distribution(self, household_id, items_taken):
         """
         Handles the core logic of a distribution. It validates that we have
         enough stock, updates the inventory, logs the event, and removes
-        the household from the queue.
+        the household from the queue. `items_taken` maps item name to the
+        quantity given out, so the GUI can pass its cart straight through.
         """
-        household = None
-        for h in self.household_queue:
-            if h.id == int(household_id):
-                household = h
-                break
+        household = self.household_queue.get(int(household_id))
         
         if not household:
             raise ValueError(f"Household with ID {household_id} not found in queue.")
@@ -204,58 +389,93 @@ class PantryManager:
         # Before we change any data,
         # we first check if all requested items are in stock. This prevents
         # a "partial" distribution where some items are given but others aren't.
-        for item_taken in items_taken_data:
-            item_in_stock = None
-            for i in self.inventory:
-                if i.name.lower() == item_taken['name'].lower():
-                    item_in_stock = i
-                    break
+        # Nothing is changed until every item has passed the check. Names that
+        # differ only in case take from the same stock, so the amount asked of
+        # each stock item is added up before it's compared.
+        plan = {}
+        for name, quantity in items_taken.items():
+            items_with_name = self._by_name.get(name.lower())
+            item_in_stock = items_with_name[0] if items_with_name else None
             
             if not item_in_stock:
-                raise ValueError(f"Item {item_taken['name']} not found in inventory.")
-            if item_in_stock.quantity < item_taken['quantity']:
-                raise ValueError(f"Insufficient stock for {item_taken['name']}.")
+                raise ValueError(f"Item {name} not found in inventory.")
+            total_quantity = plan.get(item_in_stock, 0) + quantity
+            if item_in_stock.quantity < total_quantity:
+                raise ValueError(f"Insufficient stock for {name}.")
             
-            item_in_stock.quantity -= item_taken['quantity']
+            plan[item_in_stock] = total_quantity
+
+        for item_in_stock, quantity in plan.items():
+            was_in_stock = item_in_stock.quantity > 0
+            item_in_stock.quantity -= quantity
+            self._unique_positive += (item_in_stock.quantity > 0) - was_in_stock
         
         distribution_record = {
             'household_name': household.name,
             'household_size': household.size,
-            'items': items_taken_data,
+            'items': [{'name': name, 'quantity': quantity} for name, quantity in items_taken.items()],
             'date': date.today().isoformat()
         }
         self.distributions_log.append(distribution_record)
-        self.household_queue.remove(household)
-        self._save_data()
+        self._item_distribution_counter.update(items_taken)
+        self._analytics_version += 1
+        self._distribution_activity.append(self._distribution_activity_row(distribution_record))
+        del self.household_queue[household.id]
+        self._version += 1
+        self._append_record(self._distributions_fp, distribution_record)
+        self._mark_dirty()
         return distribution_record
 
+    def get_version(self):
+        """Returns a number that changes whenever the pantry's data changes."""
+        return self._version
+
+    def get_analytics_version(self):
+        """Returns a number that changes whenever get_analytics_data() would."""
+        return self._analytics_version
+
     def get_inventory(self):
-        return self.inventory
+        return list(self._inventory_index.values())
+
+    def get_inventory_index(self):
+        """
+        Returns (lowercase name, item) pairs for the inventory so searching
+        doesn't have to lowercase every name on every keystroke. It's only
+        rebuilt when new items are added to the inventory.
+        """
+        if self._inventory_search_index is None:
+            self._inventory_search_index = [(key[0], item) for key, item in self._inventory_index.items()]
+        return self._inventory_search_index
         
     def get_queue(self):
-        return self.household_queue
+        return list(self.household_queue.values())
 
     def get_pantry_status(self):
         """Provides a quick summary of key metrics for the main menu display."""
         return {
             'households_waiting': len(self.household_queue),
-            'unique_items_in_inventory': len([item for item in self.inventory if item.quantity > 0])
+            'unique_items_in_inventory': self._unique_positive
         }
 
-    def get_analytics_data(self):
+    def get_recent_activity(self, limit=10):
         """
-        Processes the raw distribution log to provide
-        data suitable for creating a graph.
+        Returns the newest donations and distributions as (date, type, details)
+        rows, newest first. Both logs are appended in date order, so walking
+        them backwards and merging avoids sorting everything.
         """
-        item_counts = {}
-        for record in self.distributions_log:
-            for item in record['items']:
-                name = item['name']
-                quantity = item['quantity']
-                item_counts[name] = item_counts.get(name, 0) + quantity
-        
-        # Sorting the data here means the UI doesn't have to. The manager
-        # provides the data ready to display.
-        sorted_items = sorted(item_counts.items(), key=lambda x: x[1], reverse=True)
-        
-        return dict(sorted_items)
+        latest = heapq.merge(reversed(self._donation_activity), reversed(self._distribution_activity),
+                             key=lambda row: row[0], reverse=True)
+        return list(itertools.islice(latest, limit))
+
+    def get_analytics_data(self, limit=10):
+        """
+        Provides the `limit` most distributed items as (name, total quantity)
+        tuples, ready for creating a graph. They're in increasing order,
+        because a horizontal bar chart draws its first bar at the bottom.
+        """
+        # Picking and ordering the data here means the UI doesn't have to.
+        # most_common(limit) only keeps the top items (heapq.nlargest) rather
+        # than sorting every item we've ever given out.
+        top_items = self._item_distribution_counter.most_common(limit)
+        top_items.reverse()
+        return top_items
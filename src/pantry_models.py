@@ -1,7 +1,18 @@
+import sys
+
 class InventoryItem:
     """Represents a single item in the pantry's inventory."""
+    # __slots__ stops Python giving every object its own attribute dict,
+    # which saves a lot of memory when there are thousands of them.
+    __slots__ = ('name', 'quantity', 'expiration_date', '_name_lower')
+
     def __init__(self, name, quantity, expiration_date):
-        self.name = name
+        # The same item names come up over and over, so each distinct name is
+        # only stored once (sys.intern) and shared by every item that uses it.
+        self.name = sys.intern(name)
+        # Names are compared without case, so the lowercase form is kept
+        # instead of being worked out again on every comparison.
+        self._name_lower = name.lower()
         self.quantity = int(quantity)
         self.expiration_date = expiration_date
 
@@ -15,37 +26,41 @@ class InventoryItem:
 
 class Donation:
     """Represents a single donation event (either food or money)."""
+    __slots__ = ('donor', 'type', 'details', 'date', '_items')
+
     def __init__(self, donor, donation_type, details, date):
         self.donor = donor
         self.type = donation_type # This will be either 'Food' or 'Money'
-        self.details = details    # For 'Food', this is a list of InventoryItem objects.
+        self.details = details    # For 'Food', this is a list of InventoryItem objects
+                                  # (or plain dicts, for donations loaded from a file).
                                   # For 'Money', this is just a number (the amount).
         self.date = date
+        self._items = None
+
+    @property
+    def items(self):
+        """
+        The donated food as a list of InventoryItem objects (only for 'Food'
+        donations). Details loaded from a file are plain dicts, so they're
+        turned into objects the first time this is used, and then kept.
+        """
+        if self._items is None:
+            self._items = [item if isinstance(item, InventoryItem) else InventoryItem(**item)
+                           for item in self.details]
+        return self._items
 
     def to_dict(self):
         """
         Converts the Donation object into a dictionary so it can be saved
         as JSON. This method handles the two different types of donations.
         """
-        if self.type == 'Food':
-            # If it's a food donation, we know 'self.details' is a list of
-            # InventoryItem objects. We need to loop through this list.
-                        
-            items_as_dicts = []
-            
-            # For each InventoryItem object in our details list...
-            for item_object in self.details:
-                # ...call its own .to_dict() method to convert it...
-                item_dict = item_object.to_dict()
-                items_as_dicts.append(item_dict)
-                
-            details_to_save = items_as_dicts
-            
-        else: # This handles the 'Money' donation case.
-            # If it's a money donation, 'self.details' is just a number.
-            # We can use it directly without any conversion.
-            details_to_save = self.details
-            
+        details_to_save = self.details
+        # A money donation's details are just a number, and food details
+        # loaded from a file are already dicts. Only food donations made this
+        # session hold InventoryItem objects that need converting.
+        if self.type == 'Food' and details_to_save and not isinstance(details_to_save[0], dict):
+            details_to_save = [item.to_dict() for item in details_to_save]
+
         # Return the final dictionary for the entire Donation object.
         return {
             'donor': self.donor,
@@ -56,6 +71,8 @@ class Donation:
 
 class Household:
     """Represents a household waiting in the queue."""
+    __slots__ = ('id', 'name', 'size')
+
     def __init__(self, household_id, name, size):
         self.id = household_id
         self.name = name